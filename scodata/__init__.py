@@ -1222,8 +1222,7 @@ def create_dir(directory):
     string
         Absolute directory path
     """
-    if not os.access(directory, os.F_OK):
-        os.makedirs(directory)
+    datastore.create_dir(directory)
     return os.path.abspath(directory)
 
 
@@ -404,13 +404,10 @@ def attributes_to_dict(attributes):
     list(dict(name:..., value:...))
         List of key-value pairs.
     """
-    result = []
-    for key in attributes:
-        result.append({
-            'name' : key,
-            'value' : attributes[key].value
-        })
-    return result
+    return [
+        {'name' : key, 'value' : attr.value}
+            for key, attr in attributes.items()
+        ]
 
 
 def to_dict(attributes, definitions):
@@ -7,6 +7,7 @@ results of model runs.
 
 from abc import abstractmethod, abstractproperty
 import datetime
+import errno
 import os
 import pymongo
 import re
@@ -40,6 +41,13 @@ PROPERTY_READONLY = 'readOnly'
 # Object state
 PROPERTY_STATE = 'state'
 
+# Format of ISO timestamp strings (as generated by datetime.isoformat()) that
+# are stored in the database. The fraction of seconds is omitted by isoformat()
+# if it is zero.
+TIMESTAMP_FORMAT = re.compile(
+    r'^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?$'
+)
+
 
 # ------------------------------------------------------------------------------
 #
@@ -76,6 +84,8 @@ class ObjectHandle(object):
     type : string
         Object type identifier
     """
+    __slots__ = ('identifier', 'timestamp', 'properties', 'is_active')
+
     def __init__(self, identifier, timestamp, properties, is_active=True):
         """Initialize identifier, type, timestamp, and properties. Raises an
         exception if the given type is not a valid object type or if the
@@ -148,6 +158,8 @@ class DataObjectHandle(ObjectHandle):
     directory : string
         (Absolute) path to local directory containing object's data files.
     """
+    __slots__ = ('directory',)
+
     def __init__(self, identifier, timestamp, properties, directory, is_active=True):
         """Initialize basic handle properties and data directory.
 
@@ -365,26 +377,65 @@ class ObjectStore(object):
         if not obj is None:
             # Modify property set of retrieved object handle. Raise exception if
             # and of the upserts is not valid.
-            for key in properties:
-                value = properties[key]
-                # If the update affects an immutable property raise exception
-                if not ignore_constraints and key in self.immutable_properties:
-                    raise ValueError('update to immutable property: ' + key)
-                # Check whether the operation is an UPSERT (value != None) or
-                # DELETE (value == None)
-                if not value is None:
-                    obj.properties[key] = value
-                else:
-                    # DELETE. Make sure the property is not mandatory
-                    if not ignore_constraints and key in self.mandatory_properties:
-                        raise ValueError('delete mandatory property: ' + key)
-                    elif key in obj.properties:
-                        del obj.properties[key]
+            upserts, deletes = self.validate_property_updates(
+                properties,
+                ignore_constraints=ignore_constraints
+            )
+            obj.properties.update(upserts)
+            for key in deletes:
+                if key in obj.properties:
+                    del obj.properties[key]
             # Update object in database
             self.replace_object(obj)
         # Return object handle
         return obj
 
+    def validate_property_updates(self, properties, ignore_constraints=False):
+        """Validate a set of property updates. Splits the given dictionary
+        into properties that are inserted or updated and properties that are
+        deleted (i.e., have value None).
+
+        Raises ValueError if a property name is not a valid key (i.e., is not
+        a string, is empty, contains '.', or starts with '$'), if the update affects an
+        immutable property, or if a mandatory property is deleted. The
+        immutable and mandatory property constraints can be disabled using the
+        ignore_constraints parameter.
+
+        Parameters
+        ----------
+        properties : Dictionary()
+            Dictionary of property names and their new values.
+        ignore_constraints : Boolean
+            Flag indicating whether to ignore immutable and mandatory property
+            constraints (True) or nore (False, Default).
+
+        Returns
+        -------
+        Dictionary(), List(string)
+            Dictionary of upserted properties and list of deleted property
+            names
+        """
+        upserts = {}
+        deletes = []
+        for key in properties:
+            value = properties[key]
+            # Property names are used as keys in the database documents
+            if not isinstance(key, basestring) or not key or '.' in key or key.startswith('$'):
+                raise ValueError('invalid property name: ' + repr(key))
+            # If the update affects an immutable property raise exception
+            if not ignore_constraints and key in self.immutable_properties:
+                raise ValueError('update to immutable property: ' + key)
+            # Check whether the operation is an UPSERT (value != None) or
+            # DELETE (value == None)
+            if not value is None:
+                upserts[key] = value
+            else:
+                # DELETE. Make sure the property is not mandatory
+                if not ignore_constraints and key in self.mandatory_properties:
+                    raise ValueError('delete mandatory property: ' + key)
+                deletes.append(key)
+        return upserts, deletes
+
 
 class MongoDBStore(ObjectStore):
     """MongoDB Object Store - Abstract implementation of a data store that uses
@@ -547,9 +598,8 @@ class MongoDBStore(ObjectStore):
         result = []
         # Build the document query
         doc = {'active' : True}
-        if not query is None:
-            for key in query:
-                doc[key] = query[key]
+        if query:
+            doc.update(query)
         # Iterate over all objects in the MongoDB collection and add them to
         # the result
         coll = self.collection.find(doc).sort([('timestamp', pymongo.DESCENDING)])
@@ -595,9 +645,64 @@ class MongoDBStore(ObjectStore):
         # Base Json serialization for database objects
         return {
             '_id' : db_obj.identifier,
-            'timestamp' : str(db_obj.timestamp.isoformat()),
+            'timestamp' : db_obj.timestamp.isoformat(),
             'properties' : db_obj.properties}
 
+    def upsert_object_property(self, identifier, properties, ignore_constraints=False):
+        """Override ObjectStore.upsert_object_property. Modifies the property
+        set with a single atomic update in the database that returns the
+        updated document.
+
+        Parameters
+        ----------
+        identifier : string
+            Unique object identifier
+        properties : Dictionary()
+            Dictionary of property names and their new values.
+        ignore_constraints : Boolean
+            Flag indicating whether to ignore immutable and mandatory property
+            constraints (True) or nore (False, Default).
+
+        Returns
+        -------
+        ObjectHandle
+            Handle to updated object or None if object does not exist
+        """
+        # Validate all upserts before modifying the database. Raise exception
+        # if any of the upserts is not valid. As in the default implementation,
+        # the result is None for unknown objects even if the upserts are
+        # invalid. The existence check is only necessary in the error case.
+        try:
+            upserts, deletes = self.validate_property_updates(
+                properties,
+                ignore_constraints=ignore_constraints
+            )
+        except ValueError:
+            if not self.exists_object(identifier):
+                return None
+            raise
+        update = {}
+        if upserts:
+            update['$set'] = {
+                'properties.' + key : upserts[key] for key in upserts
+            }
+        if deletes:
+            update['$unset'] = {'properties.' + key : '' for key in deletes}
+        # Nothing to update if the property set is empty
+        if not update:
+            return self.get_object(identifier)
+        # Update object in database and return the modified object or None if
+        # no active object with the given identifier exists.
+        document = self.collection.find_one_and_update(
+            {'_id': identifier, 'active': True},
+            update,
+            return_document=pymongo.ReturnDocument.AFTER
+        )
+        if not document is None:
+            return self.from_dict(document)
+        else:
+            return None
+
 
 class DefaultObjectStore(MongoDBStore):
     """Extension of MongoDB store with an directory to store external files.
@@ -633,3 +738,54 @@ class DefaultObjectStore(MongoDBStore):
         if not os.path.isdir(base_directory):
             raise ValueError('not a directory: ' + base_directory)
         self.directory = base_directory
+
+
+# ------------------------------------------------------------------------------
+#
+# Helper methods
+#
+# ------------------------------------------------------------------------------
+
+def create_dir(directory):
+    """Create given directory (including missing parent directories) if it
+    doesn't exist. Attempts to create the directory directly instead of testing
+    for its existence first.
+
+    Parameters
+    ----------
+    directory : string
+        Directory path (can be relative or absolute)
+    """
+    try:
+        os.makedirs(directory)
+    except OSError as err:
+        # Ignore the error if the directory already exists
+        if err.errno != errno.EEXIST or not os.path.isdir(directory):
+            raise
+
+
+def timestamp_from_string(value):
+    """Convert an ISO timestamp string as stored in the database into a
+    datetime object. Uses a pre-compiled regular expression instead of
+    datetime.strptime() to avoid parsing the format string for each object
+    that is read from the database.
+
+    Raises ValueError if the given string is not a valid timestamp.
+
+    Parameters
+    ----------
+    value : string
+        ISO representation of a timestamp (i.e., YYYY-MM-DDTHH:MM:SS.ffffff)
+
+    Returns
+    -------
+    datetime
+    """
+    match = TIMESTAMP_FORMAT.match(value)
+    if match is None:
+        raise ValueError('invalid timestamp: ' + value)
+    values = match.groups('0')
+    # The fraction of a second may have fewer than six digits. Pad it to
+    # microseconds (like strptime's %f directive).
+    fraction = values[6].ljust(6, '0')
+    return datetime.datetime(*([int(val) for val in values[:6]] + [int(fraction)]))
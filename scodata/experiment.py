@@ -2,7 +2,6 @@
 definitions for SCO model predictions.
 """
 
-import datetime
 import uuid
 
 import datastore
@@ -165,7 +164,7 @@ class DefaultExperimentManager(datastore.MongoDBStore):
         """
         identifier = str(document['_id'])
         active = document['active']
-        timestamp = datetime.datetime.strptime(document['timestamp'], '%Y-%m-%dT%H:%M:%S.%f')
+        timestamp = datastore.timestamp_from_string(document['timestamp'])
         properties = document['properties']
         subject_id = document['subject']
         image_group_id = document['images']
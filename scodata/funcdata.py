@@ -3,7 +3,6 @@ scans of subjects in experiments. Contains objects to represent and manipulate
 functional data files on local disk.
 """
 
-import datetime
 import os
 import shutil
 import tarfile
@@ -209,8 +208,7 @@ class DefaultFunctionalDataManager(datastore.DefaultObjectStore):
         # The object directory is given by the object identifier.
         object_dir = os.path.join(self.directory, identifier)
         # Create (sub-)directories for the uploaded and extracted data files.
-        if not os.access(object_dir, os.F_OK):
-            os.makedirs(object_dir)
+        datastore.create_dir(object_dir)
         data_dir = os.path.join(object_dir, DATA_DIRECTORY)
         os.mkdir(data_dir)
         func_data_file = prop_name
@@ -254,6 +252,6 @@ class DefaultFunctionalDataManager(datastore.DefaultObjectStore):
         # The directory is not materilaized in database to allow moving the
         # base directory without having to update the database.
         directory = os.path.join(self.directory, identifier)
-        timestamp = datetime.datetime.strptime(document['timestamp'], '%Y-%m-%dT%H:%M:%S.%f')
+        timestamp = datastore.timestamp_from_string(document['timestamp'])
         properties = document['properties']
         return FunctionalDataHandle(identifier, properties, directory, timestamp=timestamp, is_active=active)
@@ -2,7 +2,6 @@
 collections of images, and their properties.
 """
 
-import datetime
 import os
 import shutil
 import uuid
@@ -361,8 +360,7 @@ class DefaultImageManager(datastore.DefaultObjectStore):
         # characters of the identifier.
         image_dir = self.get_directory(identifier)
         # Create the directory if it doesn't exists
-        if not os.access(image_dir, os.F_OK):
-            os.makedirs(image_dir)
+        datastore.create_dir(image_dir)
         # Create the initial set of properties for the new image object.
         properties = {
             datastore.PROPERTY_NAME: prop_name,
@@ -399,7 +397,7 @@ class DefaultImageManager(datastore.DefaultObjectStore):
         # Get object properties from Json document
         identifier = str(document['_id'])
         active = document['active']
-        timestamp = datetime.datetime.strptime(document['timestamp'], '%Y-%m-%dT%H:%M:%S.%f')
+        timestamp = datastore.timestamp_from_string(document['timestamp'])
         properties = document['properties']
         # The directory is not materilaized in database to allow moving the
         # base directory without having to update the database.
@@ -589,8 +587,7 @@ class DefaultImageGroupManager(datastore.DefaultObjectStore):
         # Directories are simply named by object identifier
         directory = os.path.join(self.directory, identifier)
         # Create the directory if it doesn't exists
-        if not os.access(directory, os.F_OK):
-            os.makedirs(directory)
+        datastore.create_dir(directory)
         # Move original file to object directory
         shutil.copyfile(filename, os.path.join(directory, prop_filename))
         # Get dictionary of given options. If none are given opts will be an
@@ -648,10 +645,7 @@ class DefaultImageGroupManager(datastore.DefaultObjectStore):
             directory,
             images,
             attribute.attributes_from_dict(document['options']),
-            timestamp=datetime.datetime.strptime(
-                document['timestamp'],
-                '%Y-%m-%dT%H:%M:%S.%f'
-            ),
+            timestamp=datastore.timestamp_from_string(document['timestamp']),
             is_active=document['active']
         )
 
@@ -845,10 +839,7 @@ class DefaultPredictionImageSetManager(datastore.MongoDBStore):
             str(document['_id']),
             document['properties'],
             [PredictionImageSet.from_dict(img) for img in document['images']],
-            timestamp=datetime.datetime.strptime(
-                document['timestamp'],
-                '%Y-%m-%dT%H:%M:%S.%f'
-            ),
+            timestamp=datastore.timestamp_from_string(document['timestamp']),
             is_active=document['active']
         )
 
@@ -4,6 +4,7 @@ and their outputs (predictions).
 
 import datetime
 import os
+import pymongo
 import shutil
 import uuid
 
@@ -17,6 +18,12 @@ import datastore
 #
 # ------------------------------------------------------------------------------
 
+# Name of sub-folder in model run directory that contains attached files
+ATTACHMENTS_DIRECTORY = 'attachments'
+
+# Size of buffer (in bytes) when copying attached files
+COPY_BUFFER_SIZE = 1024 * 1024
+
 # Timestamp of run creation
 RUN_CREATED = 'createdAt'
 # Timestamp of run start
@@ -30,6 +37,18 @@ STATE_IDLE = 'IDLE'
 STATE_RUNNING = 'RUNNING'
 STATE_SUCCESS = 'SUCCESS'
 
+# Numeric run state codes
+CODE_IDLE, CODE_RUNNING, CODE_FAILED, CODE_SUCCESS = range(4)
+
+# Valid changes of run state. Maps the code of the new state to the list of
+# states a run has to be in for the change to be valid and the schedule entry
+# that records the time of the state change. A run cannot become idle.
+STATE_TRANSITIONS = {
+    CODE_RUNNING : ([STATE_IDLE], RUN_STARTED),
+    CODE_FAILED : ([STATE_IDLE, STATE_RUNNING], RUN_FINISHED),
+    CODE_SUCCESS : ([STATE_RUNNING], RUN_FINISHED)
+}
+
 """Unique model run resource type identifier."""
 TYPE_MODEL_RUN = 'MODEL_RUN'
 
@@ -67,21 +86,29 @@ class Attachment(object):
 class ModelRunState(object):
     """Object containing information about the state and potential results or
     error messages generated by a predictive model run. This is considered an
-    abstract class that is extended by three sub-classes for states: RUNNING,
-    FAILED, and SUCCESS.
+    abstract class that is extended by four sub-classes for states: IDLE,
+    RUNNING, FAILED, and SUCCESS.
+
+    Attributes
+    ----------
+    code : int
+        Numeric state code. Set by each sub-class.
+    type : string
+        Text description of the state. Set by each sub-class.
     """
+    __slots__ = ()
+    code = None
+    type = None
+
+    def __repr__(self):
+        """String representation of the run state object."""
+        return self.type
+
     @staticmethod
     def from_dict(json_obj):
-        # Decide on type of returned object based on fact that failed states
-        # have errors while success states have model output
-        if json_obj['type'] == STATE_FAILED and 'errors' in json_obj:
-            return ModelRunFailed(json_obj['errors'])
-        elif json_obj['type'] == STATE_SUCCESS and 'modelOutput' in json_obj:
-            return ModelRunSuccess(json_obj['modelOutput'])
-        elif json_obj['type'] == STATE_IDLE:
-            return ModelRunIdle()
-        elif json_obj['type'] == STATE_RUNNING:
-            return ModelRunActive()
+        # Decide on type of returned object by a single lookup of the state
+        # type in the dictionary of state constructors
+        return STATE_FROM_DICT[json_obj['type']](json_obj)
 
     @property
     def is_failed(self):
@@ -92,7 +119,7 @@ class ModelRunState(object):
         Boolean
             True, if model run is in falied state.
         """
-        return False
+        return self.code == CODE_FAILED
 
     @property
     def is_idle(self):
@@ -103,7 +130,7 @@ class ModelRunState(object):
         Boolean
             True, if model run is in idle state.
         """
-        return False
+        return self.code == CODE_IDLE
 
     @property
     def is_running(self):
@@ -114,7 +141,7 @@ class ModelRunState(object):
         Boolean
             True, if model run is in running state.
         """
-        return False
+        return self.code == CODE_RUNNING
 
     @property
     def is_success(self):
@@ -125,39 +152,42 @@ class ModelRunState(object):
         Boolean
             True, if model run is in success state.
         """
-        return False
+        return self.code == CODE_SUCCESS
+
+    def as_dict(self):
+        """Generate a JSON serialization for the run state object. Sub-classes
+        that carry state-specific elements override this method.
+
+        Returns
+        -------
+        Json-like object
+            Json serialization of model run state object
+        """
+        # Have text description of state in Json object (for readability)
+        return {'type' : self.type}
 
     @staticmethod
     def to_dict(obj):
-        """Generate a JSON serialization for the run state object.
+        """Generate a JSON serialization for the given run state object.
+
+        Parameters
+        ----------
+        obj : ModelRunState
+            Model run state object
 
         Returns
         -------
         Json-like object
             Json serialization of model run state object
         """
-        # Have text description of state in Json object (for readability)
-        json_obj = {'type' : repr(obj)}
-        # Add state-specific elementsTYPE_MODEL_RUN
-        if obj.is_failed:
-            json_obj['errors'] = obj.errors
-        elif obj.is_success:
-            json_obj['modelOutput'] = obj.model_output
-        return json_obj
+        return obj.as_dict()
 
 
 class ModelRunActive(ModelRunState):
     """Object indicating an active model run."""
-    def __repr__(self):
-        """String representation of the run state object."""
-        return STATE_RUNNING
-
-    @property
-    def is_running(self):
-        """Override is_running flag to indicate that this object represents a
-        failed model run.
-        """
-        return True
+    __slots__ = ()
+    type = STATE_RUNNING
+    code = CODE_RUNNING
 
 
 class ModelRunFailed(ModelRunState):
@@ -170,7 +200,11 @@ class ModelRunFailed(ModelRunState):
     errors : list(string), optional
         List of error messages
     """
-    def __init__(self, errors=[]):
+    __slots__ = ('errors',)
+    type = STATE_FAILED
+    code = CODE_FAILED
+
+    def __init__(self, errors=None):
         """Initialize list of errors. Set as an empty list if no error messages
         are given.
 
@@ -179,32 +213,27 @@ class ModelRunFailed(ModelRunState):
         errors : list(string), optional
             List of error messages
         """
-        self.errors = errors
+        self.errors = errors if not errors is None else []
 
-    def __repr__(self):
-        """String representation of the run state object."""
-        return STATE_FAILED
+    def as_dict(self):
+        """Override ModelRunState.as_dict. Adds the list of error messages. The
+        list is omitted if empty.
 
-    @property
-    def is_failed(self):
-        """Override is_failed flag to indicate that this object represents a
-        failed model run.
+        Returns
+        -------
+        Json-like object
+            Json serialization of model run state object
         """
-        return True
+        if self.errors:
+            return {'type' : STATE_FAILED, 'errors' : self.errors}
+        return {'type' : STATE_FAILED}
 
 
 class ModelRunIdle(ModelRunState):
     """Object indicating an idle model run."""
-    def __repr__(self):
-        """String representation of the run state object."""
-        return STATE_IDLE
-
-    @property
-    def is_idle(self):
-        """Override is_idle flag to indicate that this object represents an
-        idle model run.
-        """
-        return True
+    __slots__ = ()
+    type = STATE_IDLE
+    code = CODE_IDLE
 
 
 class ModelRunSuccess(ModelRunState):
@@ -217,6 +246,10 @@ class ModelRunSuccess(ModelRunState):
         Unique identifier of functional data object containing the model run
         output
     """
+    __slots__ = ('model_output',)
+    type = STATE_SUCCESS
+    code = CODE_SUCCESS
+
     def __init__(self, model_output):
         """Initialize reference to model output object.
 
@@ -228,16 +261,31 @@ class ModelRunSuccess(ModelRunState):
         """
         self.model_output = model_output
 
-    def __repr__(self):
-        """String representation of the run state object."""
-        return STATE_SUCCESS
+    def as_dict(self):
+        """Override ModelRunState.as_dict. Adds the reference to the model
+        output.
 
-    @property
-    def is_success(self):
-        """Override is_success flag to indicate that this object represents a
-        failed model run.
+        Returns
+        -------
+        Json-like object
+            Json serialization of model run state object
         """
-        return True
+        return {'type' : STATE_SUCCESS, 'modelOutput' : self.model_output}
+
+
+# Idle and running states carry no information. Use shared instances when
+# creating or reading them from the database.
+IDLE_STATE = ModelRunIdle()
+ACTIVE_STATE = ModelRunActive()
+
+# Constructors for run state objects keyed by the state type in their
+# dictionary serialization.
+STATE_FROM_DICT = {
+    STATE_FAILED : lambda obj: ModelRunFailed(obj.get('errors')),
+    STATE_IDLE : lambda obj: IDLE_STATE,
+    STATE_RUNNING : lambda obj: ACTIVE_STATE,
+    STATE_SUCCESS : lambda obj: ModelRunSuccess(obj['modelOutput'])
+}
 
 
 # ------------------------------------------------------------------------------
@@ -277,6 +325,16 @@ class ModelRunHandle(datastore.DataObjectHandle):
     state: ModelRunState
         Model run state object
     """
+    __slots__ = (
+        'arguments',
+        'attachments',
+        'attachment_directory',
+        'experiment_id',
+        'model_id',
+        'schedule',
+        'state'
+    )
+
     def __init__(
         self,
         identifier,
@@ -286,7 +344,7 @@ class ModelRunHandle(datastore.DataObjectHandle):
         experiment_id,
         model_id,
         arguments,
-        attachments={},
+        attachments=None,
         schedule=None,
         timestamp=None,
         is_active=True):
@@ -333,16 +391,19 @@ class ModelRunHandle(datastore.DataObjectHandle):
         self.experiment_id = experiment_id
         self.model_id = model_id
         self.arguments = arguments
-        self.attachments = attachments
+        self.attachments = attachments if not attachments is None else {}
         # Set state change information. Only allowed to be missing at run
         # creation, i.e., if timestamp is none.
         if schedule is None:
             if not timestamp is None:
                 raise ValueError('missing schedule information')
-            self.schedule = {RUN_CREATED : str(self.timestamp.isoformat())}
+            self.schedule = {RUN_CREATED : self.timestamp.isoformat()}
         else:
             self.schedule = schedule
-        self.attachment_directory = os.path.join(self.directory, 'attachments')
+        self.attachment_directory = os.path.join(
+            self.directory,
+            ATTACHMENTS_DIRECTORY
+        )
 
     @property
     def type(self):
@@ -377,6 +438,24 @@ class DefaultModelRunManager(datastore.DefaultObjectStore):
             mongo_collection,
             base_directory,
             [datastore.PROPERTY_STATE, datastore.PROPERTY_MODEL])
+        # Make the base directory absolute once. Run directories (and their
+        # attachment directories) are derived from it and are therefore
+        # absolute as well.
+        self.directory = os.path.abspath(self.directory)
+        # Create indexes for the queries on model runs. Runs are listed by
+        # experiment (ordered by timestamp) and may be filtered by state or
+        # model. All queries only consider active objects. Creating an index
+        # that already exists has no effect.
+        self.collection.create_index([
+            ('active', pymongo.ASCENDING),
+            ('experiment', pymongo.ASCENDING),
+            ('timestamp', pymongo.DESCENDING)
+        ])
+        for prop in [datastore.PROPERTY_STATE, datastore.PROPERTY_MODEL]:
+            self.collection.create_index([
+                ('active', pymongo.ASCENDING),
+                ('properties.' + prop, pymongo.ASCENDING)
+            ])
 
     def create_data_file_attachment(self, identifier, resource_id, filename, mime_type=None):
         """Attach a given data file with a model run. The attached file is
@@ -410,24 +489,36 @@ class DefaultModelRunManager(datastore.DefaultObjectStore):
         if model_run is None:
             return None
         # It is only possible to attach files to successful model run
-        if not model_run.state.is_success:
+        if model_run.state.code != CODE_SUCCESS:
             raise ValueError('cannot attach file to model run in state: ' + str(model_run.state))
         # The attachment will be written to a file with name resource_id
-        # inside the model run's attachment directory. If the resource id
-        # contains path components we will create sub-folders for them. If the
-        # resource file exists it will be overwritten.
-        target = os.path.abspath(
-            os.path.join(model_run.attachment_directory, resource_id)
+        # inside the model run's attachment directory. If the resource file
+        # exists it will be overwritten. The attachment directory is absolute
+        # already. The target only needs to be normalized.
+        attachment_directory = model_run.attachment_directory
+        target = os.path.normpath(
+            os.path.join(attachment_directory, resource_id)
         )
         directory, local_name = os.path.split(target)
         # Make sure that the given resource identifier does not result in the
-        # file bein palced in a directory other than the attachments directory.
-        if directory != model_run.attachment_directory:
+        # file being placed in a directory other than the attachments
+        # directory (i.e., contains no path components).
+        if directory != attachment_directory:
             raise ValueError('invalid resource identifier: ' + resource_id)
         # Create the attachments directory if it doesn't exist
-        if not os.path.exists(model_run.attachment_directory):
-            os.makedirs(model_run.attachment_directory)
-        shutil.copyfile(filename, target)
+        datastore.create_dir(attachment_directory)
+        # Copy the file into a temporary file in the attachments directory
+        # first and then rename it. This replaces an existing attachment file
+        # in a single step. Remove the temporary file if copying fails.
+        tmp_target = os.path.join(attachment_directory, '.' + uuid.uuid4().hex)
+        try:
+            with open(filename, 'rb') as f_in, open(tmp_target, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out, COPY_BUFFER_SIZE)
+            os.rename(tmp_target, target)
+        except (IOError, OSError):
+            if os.path.isfile(tmp_target):
+                os.remove(tmp_target)
+            raise
         if mime_type is None:
             # Mime type is derived from the file name
             mime_type = 'text/plain'
@@ -443,13 +534,42 @@ class DefaultModelRunManager(datastore.DefaultObjectStore):
                 mime_type = 'image/jpeg'
             elif filename.endswith('.gif'):
                 mime_type = 'image/gif'
-        # Update model run information in the database
-        model_run.attachments[resource_id] = Attachment(
-            resource_id,
-            mime_type,
-            os.path.getsize(target)
-        )
-        self.replace_object(model_run)
+        # Update model run information in the database. Only modify the
+        # attachment list instead of replacing the whole object. Replace an
+        # existing attachment with the same identifier in place. The attachment
+        # is appended if it did not exist (or has been deleted since the model
+        # run was read).
+        attachment = Attachment(resource_id, mime_type, os.path.getsize(target))
+        attachment_doc = attachment.to_dict()
+        replace_query = {
+            '_id' : identifier,
+            'active' : True,
+            'attachments.id' : resource_id
+        }
+        replace_update = {'$set' : {'attachments.$' : attachment_doc}}
+        result = None
+        if resource_id in model_run.attachments:
+            result = self.collection.update_one(replace_query, replace_update)
+        if result is None or result.matched_count == 0:
+            # Only append the attachment if no attachment with the same
+            # identifier exists. Otherwise, the attachment has been added
+            # since the model run was read and is replaced instead.
+            result = self.collection.update_one(
+                {
+                    '_id' : identifier,
+                    'active' : True,
+                    'attachments.id' : {'$ne' : resource_id}
+                },
+                {'$push' : {'attachments' : attachment_doc}}
+            )
+            if result.matched_count == 0:
+                result = self.collection.update_one(replace_query, replace_update)
+        if result.matched_count == 0:
+            # The model run has been deleted since it was read. Remove the
+            # copied file.
+            os.remove(target)
+            return None
+        model_run.attachments[resource_id] = attachment
         # Return modified model run
         return model_run
 
@@ -484,20 +604,22 @@ class DefaultModelRunManager(datastore.DefaultObjectStore):
         # simply named by object identifier
         directory = os.path.join(self.directory, identifier)
         # Create the directory if it doesn't exists
-        if not os.access(directory, os.F_OK):
-            os.makedirs(directory)
+        datastore.create_dir(directory)
         # By default all model runs are in IDLE state at creation
-        state = ModelRunIdle()
+        state = IDLE_STATE
         # Create the initial set of properties.
         run_properties = {
             datastore.PROPERTY_NAME: name,
-            datastore.PROPERTY_STATE: str(state),
+            datastore.PROPERTY_STATE: state.type,
             datastore.PROPERTY_MODEL: model_id
         }
-        if not properties is None:
-            for prop in properties:
-                if not prop in run_properties:
-                    run_properties[prop] = properties[prop]
+        # Add user-provided properties. They cannot override the initial set.
+        if properties:
+            run_properties.update({
+                key : value
+                    for key, value in properties.items()
+                        if not key in run_properties
+                })
         # If argument list is not given then the initial set of arguments is
         # empty. Here we do not validate the given arguments. Definitions of
         # valid argument sets are maintained in the model registry and are not
@@ -540,18 +662,25 @@ class DefaultModelRunManager(datastore.DefaultObjectStore):
             True, if file was deleted. False, if no attachment with given
             identifier existed.
         """
-        # Get model run to ensure that it exists. If not return False
-        model_run = self.get_object(identifier)
-        if model_run is None:
-            return False
-        # Ensure that attachment with given resource identifier exists.
-        if not resource_id in model_run.attachments:
+        # Remove the attachment from the model run in the database. The update
+        # will not match any document if the model run does not exist or if
+        # it has no attachment with the given resource identifier. In both
+        # cases return False.
+        result = self.collection.update_one(
+            {'_id' : identifier, 'active' : True, 'attachments.id' : resource_id},
+            {'$pull' : {'attachments' : {'id' : resource_id}}}
+        )
+        if result.matched_count == 0:
             return False
         # Delete file on disk
-        os.remove(os.path.join(model_run.attachment_directory, resource_id))
-        # Update model run information in the database
-        del model_run.attachments[resource_id]
-        self.replace_object(model_run)
+        os.remove(
+            os.path.join(
+                self.directory,
+                identifier,
+                ATTACHMENTS_DIRECTORY,
+                resource_id
+            )
+        )
         return True
 
     def from_dict(self, document):
@@ -569,13 +698,14 @@ class DefaultModelRunManager(datastore.DefaultObjectStore):
         """
         # Get object identifier from Json document
         identifier = str(document['_id'])
-        # Directories are simply named by object identifier
-        directory = os.path.join(self.directory, identifier)
-        # Create attachment descriptors
-        attachments = {}
-        for obj in document['attachments']:
-            attachment = Attachment.from_dict(obj)
-            attachments[attachment.identifier] = attachment
+        # Directories are simply named by object identifier. The base directory
+        # is absolute and normalized (i.e., has no trailing separator).
+        directory = self.directory + os.sep + identifier
+        # Create attachment descriptors keyed by their identifier
+        attachments = {
+            obj['id'] : Attachment.from_dict(obj)
+                for obj in document['attachments']
+            }
         # Create model run handle.
         return ModelRunHandle(
             identifier,
@@ -587,9 +717,7 @@ class DefaultModelRunManager(datastore.DefaultObjectStore):
             attribute.attributes_from_dict(document['arguments']),
             attachments=attachments,
             schedule=document['schedule'],
-            timestamp=datetime.datetime.strptime(
-                document['timestamp'], '%Y-%m-%dT%H:%M:%S.%f'
-            ),
+            timestamp=datastore.timestamp_from_string(document['timestamp']),
             is_active=document['active']
         )
 
@@ -617,10 +745,9 @@ class DefaultModelRunManager(datastore.DefaultObjectStore):
         if model_run is None:
             return None, None
         # Ensure that attachment with given resource identifier exists.
-        if not resource_id in model_run.attachments:
+        attachment = model_run.attachments.get(resource_id)
+        if attachment is None:
             return None, None
-        # Raise an exception if the attached resource is not a data file
-        attachment = model_run.attachments[resource_id]
         filename = os.path.join(model_run.attachment_directory, resource_id)
         return filename, attachment.mime_type
 
@@ -641,7 +768,7 @@ class DefaultModelRunManager(datastore.DefaultObjectStore):
         # Get the basic Json object from the super class
         json_obj = super(DefaultModelRunManager, self).to_dict(model_run)
         # Add run state
-        json_obj['state'] = ModelRunState.to_dict(model_run.state)
+        json_obj['state'] = model_run.state.as_dict()
         # Add run scheduling Timestamps
         json_obj['schedule'] = model_run.schedule
         # Add experiment information
@@ -675,33 +802,38 @@ class DefaultModelRunManager(datastore.DefaultObjectStore):
             Modified model run handle or None if no run with given identifier
             exists
         """
-        # Get model run to ensure that it exists
-        model_run = self.get_object(identifier)
-        if model_run is None:
-            return None
-        # Set timestamp of state change. Raise exception if state change results
-        # in invalid life cycle
-        timestamp = str(datetime.datetime.utcnow().isoformat())
-        if state.is_idle:
-            raise ValueError('invalid state change: run cannot become idle')
-        elif state.is_running:
-            # Current state is required to be IDLE
-            if not model_run.state.is_idle:
-                raise ValueError('invalid state change: finished run cannot start again')
-            model_run.schedule[RUN_STARTED] = timestamp
-        elif state.is_failed:
-            # Current state is required to be RUNNING
-            if not (model_run.state.is_running or model_run.state.is_idle):
-                raise ValueError('invalid state change: cannot fail finished run')
-            model_run.schedule[RUN_FINISHED] = timestamp
-        elif state.is_success:
-            # Current state is required to be RUNNING
-            if not model_run.state.is_running:
-                raise ValueError('invalid state change: cannot finish inactive run')
-            model_run.schedule[RUN_FINISHED] = timestamp
-        # Update model run state and replace object in database
-        model_run.state = state
-        model_run.properties[datastore.PROPERTY_STATE] = str(state)
-        self.replace_object(model_run)
+        # Get the list of valid current states and the schedule entry for the
+        # state change. Raise exception if the new state is not reachable
+        # (unless the model run does not exist).
+        transition = STATE_TRANSITIONS.get(state.code)
+        if transition is None:
+            if not self.exists_object(identifier):
+                return None
+            raise ValueError('invalid state change: run cannot become ' + state.type)
+        valid_states, schedule_key = transition
+        # Update the model run in a single atomic operation. The update only
+        # matches if the run is in one of the valid states for the change.
+        document = self.collection.find_one_and_update(
+            {
+                '_id' : identifier,
+                'active' : True,
+                'state.type' : {'$in' : valid_states}
+            },
+            {'$set' : {
+                'state' : state.as_dict(),
+                'properties.' + datastore.PROPERTY_STATE : state.type,
+                'schedule.' + schedule_key : datetime.datetime.utcnow().isoformat()
+            }},
+            return_document=pymongo.ReturnDocument.AFTER
+        )
+        if document is None:
+            # Either the model run does not exist or the state change results
+            # in an invalid life cycle.
+            model_run = self.get_object(identifier)
+            if model_run is None:
+                return None
+            raise ValueError(
+                'invalid state change: ' + model_run.state.type + ' to ' + state.type
+            )
         # Return modified model run
-        return model_run
+        return self.from_dict(document)
@@ -11,8 +11,26 @@ from pymongo import MongoClient
 class MongoDBFactory(object):
     """Factory pattern to establish connection to default mongo database used
     by the current implementation of the SCO Web API.
+
+    The factory maintains a single client per process. The client is created
+    on first use and re-created if the factory is used in a different process
+    (e.g., after fork), since MongoClient instances are not fork-safe.
+
+    Attributes
+    ----------
+    client : MongoClient
+        Client connected to the database URI (None until first use)
+    client_options : dict
+        Additional keyword arguments for the client (e.g., connection pool
+        settings like maxPoolSize)
+    db_name : string
+        Name of the database
+    db_uri : string
+        URI of the database
+    pid : int
+        Identifier of the process that created the client
     """
-    def __init__(self, db_name='scoserv', db_uri=None):
+    def __init__(self, db_name='scoserv', db_uri=None, client_options=None):
         """Initialize the database name.
 
         Parameters
@@ -22,22 +40,44 @@ class MongoDBFactory(object):
         db_uri : string, optional
             URI of the database (default: None); if None is given then
             either the MONGODB_URI environment name or localhost is used.
+        client_options : dict, optional
+            Additional keyword arguments that are passed to the MongoClient
+            constructor (default: None)
         """
         self.db_name = db_name
         if db_uri is None:
             db_uri = os.environ.get('MONGODB_URI', 'localhost')
         self.db_uri = db_uri
+        self.client_options = client_options if not client_options is None else {}
+        self.client = None
+        self.pid = None
 
     def drop_database(self):
         """Drop the database the factory connects to."""
-        MongoClient(self.db_uri).drop_database(self.db_name)
+        self.get_client().drop_database(self.db_name)
+
+    def get_client(self):
+        """Get the mongo client for the current process. Creates a new client
+        if none exists or if the existing client was created by a different
+        process.
+
+        Returns
+        -------
+        MongoClient
+        """
+        pid = os.getpid()
+        if self.client is None or self.pid != pid:
+            self.client = MongoClient(self.db_uri, **self.client_options)
+            self.pid = pid
+        return self.client
 
     def get_database(self):
-        """Create a new default mongo database object.
+        """Get the default mongo database object. Uses the client for the
+        current process.
 
         Returns
         -------
         MongoDb.database
             MongoDB database object
         """
-        return MongoClient(self.db_uri)[self.db_name]
+        return self.get_client()[self.db_name]
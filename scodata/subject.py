@@ -3,7 +3,6 @@ scans of subjects in experiments. Contains objects to represent and manipulate
 anatomy files on local disk.
 """
 
-import datetime
 import os
 import shutil
 import tarfile
@@ -186,7 +185,7 @@ class DefaultSubjectManager(datastore.DefaultObjectStore):
         # The directory is not materilaized in database to allow moving the
         # base directory without having to update the database.
         directory = os.path.join(self.directory, identifier)
-        timestamp = datetime.datetime.strptime(document['timestamp'], '%Y-%m-%dT%H:%M:%S.%f')
+        timestamp = datastore.timestamp_from_string(document['timestamp'])
         properties = document['properties']
         return SubjectHandle(identifier, properties, directory, timestamp=timestamp, is_active=active)
 
@@ -329,7 +328,7 @@ def get_freesurfer_dir(directory):
         Sub-directory containing a Freesurfer files or None if no such
         directory is found.
     """
-    dir_files = [f for f in os.listdir(directory)]
+    dir_files = os.listdir(directory)
     # Look for sub-folders 'surf' and 'mri'
     if 'surf' in dir_files and 'mri' in dir_files:
         # Coule use neuropythy's freesurfer_subject method to test whether the
@@ -338,7 +337,7 @@ def get_freesurfer_dir(directory):
         return directory
     # Directory is not a valid freesurfer directory. Continue to search
     # recursively until a matching directory is found.
-    for f in os.listdir(directory):
+    for f in dir_files:
         sub_dir = os.path.join(directory, f)
         if os.path.isdir(sub_dir):
             if get_freesurfer_dir(sub_dir):
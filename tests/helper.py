@@ -0,0 +1,145 @@
+import glob
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+import uuid
+
+import pymongo.errors
+import scodata.mongo as mongo
+
+# Name of the database that is used by all tests
+DB_NAME = 'scotest'
+
+# Base directory for data files that are created by tests. Set the
+# SCO_TEST_DIR environment variable to use a RAM-backed file system (e.g.,
+# /dev/shm/sco) if /tmp is disk-backed. This is not the default since /dev/shm
+# is often too small for the subject data (e.g., 64 MB in Docker containers).
+TMP_BASE_DIR = os.environ.get('SCO_TEST_DIR', '/tmp/sco')
+
+# Connection pool settings for the test process. Tests run sequentially and
+# should fail fast if the database server is not available.
+CLIENT_OPTIONS = {
+    'maxPoolSize': 4,
+    'minPoolSize': 1,
+    'waitQueueTimeoutMS': 1000,
+    'serverSelectionTimeoutMS': 2000
+}
+
+# MongoDB factory that is shared by all tests. The factory maintains a single
+# client (and thereby a single connection pool) for the test process.
+MONGO = mongo.MongoDBFactory(db_name=DB_NAME, client_options=CLIENT_OPTIONS)
+
+# Result of probing the database server (None until the first probe)
+MONGO_AVAILABLE = None
+
+# Trash directories that are being removed by background threads of the
+# current test process
+TRASH_DIRS = set()
+
+# Directory for uncompressed copies of the test archives (None until the first
+# copy is created) and the copies that have been created, keyed by the name of
+# the original archive
+ARCHIVE_DIR = None
+ARCHIVE_COPIES = {}
+
+
+def mongo_available():
+    """Test whether the database server is reachable. The server is probed
+    only once per test process.
+
+    Returns
+    -------
+    Boolean
+    """
+    global MONGO_AVAILABLE
+    if MONGO_AVAILABLE is None:
+        try:
+            MONGO.get_client().admin.command('ping')
+            MONGO_AVAILABLE = True
+        except pymongo.errors.PyMongoError:
+            MONGO_AVAILABLE = False
+    return MONGO_AVAILABLE
+
+
+class MongoTestCase(unittest.TestCase):
+    """Base class for tests that use the MongoDB test database. All tests
+    share a single MongoDB factory (and thereby a single client connection).
+    The test database is cleared before each test.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Use the MongoDB factory that is shared by all tests. Skip all tests
+        in the class if the database server is not available."""
+        if not mongo_available():
+            raise unittest.SkipTest('MongoDB not available')
+        cls.mongo = MONGO
+
+    def setUp(self):
+        """Clear the test database and get the database object."""
+        self.mongo.drop_database()
+        self.db = self.mongo.get_database()
+
+
+def reset_directory(directory):
+    """Ensure that the given directory exists and is empty. An existing
+    directory is renamed and then removed in a background thread. The caller
+    does not have to wait for all files in the directory to be deleted.
+
+    The test process waits for the background threads before it exits. Trash
+    directories that were left behind by a previous test process that was
+    killed are removed first.
+
+    Parameters
+    ----------
+    directory : string
+        Path to directory
+    """
+    for trash_dir in glob.glob(directory + '.trash.*'):
+        if not trash_dir in TRASH_DIRS:
+            shutil.rmtree(trash_dir, ignore_errors=True)
+    if os.path.isdir(directory):
+        trash_dir = directory + '.trash.' + uuid.uuid4().hex
+        os.rename(directory, trash_dir)
+        TRASH_DIRS.add(trash_dir)
+        thread = threading.Thread(
+            target=shutil.rmtree,
+            args=(trash_dir,),
+            kwargs={'ignore_errors': True}
+        )
+        thread.start()
+    os.makedirs(directory)
+
+
+def decompress(filename, directory):
+    """Write an uncompressed copy of a gzipped tar archive into the given
+    directory. Returns the path to the copy.
+    """
+    target = os.path.join(directory, os.path.basename(filename)[:-len('.gz')])
+    with gzip.open(filename, 'rb') as f_in, open(target, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+    return target
+
+
+def uncompressed_archive(filename):
+    """Get an uncompressed copy of a gzipped tar archive. The copy is created
+    on first use and shared by all tests until remove_uncompressed_archives()
+    is called.
+    """
+    global ARCHIVE_DIR
+    if not filename in ARCHIVE_COPIES:
+        if ARCHIVE_DIR is None:
+            ARCHIVE_DIR = tempfile.mkdtemp()
+        ARCHIVE_COPIES[filename] = decompress(filename, ARCHIVE_DIR)
+    return ARCHIVE_COPIES[filename]
+
+
+def remove_uncompressed_archives():
+    """Remove all uncompressed archive copies."""
+    global ARCHIVE_DIR
+    if not ARCHIVE_DIR is None:
+        shutil.rmtree(ARCHIVE_DIR, ignore_errors=True)
+        ARCHIVE_DIR = None
+        ARCHIVE_COPIES.clear()
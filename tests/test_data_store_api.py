@@ -1,10 +1,9 @@
-import gzip
 import os
 import shutil
 import sys
+import tempfile
 import unittest
 
-import scodata.mongo as mongo
 import scodata as api
 import scodata.attribute as attributes
 import scodata.datastore as datastore
@@ -16,45 +15,261 @@ from scodata.image import TYPE_IMAGE, TYPE_IMAGE_GROUP, TYPE_PREDICTION_IMAGE_SE
 from scodata.modelrun import TYPE_MODEL_RUN
 from scodata.subject import TYPE_SUBJECT
 
+from helper import MongoTestCase, remove_uncompressed_archives, uncompressed_archive
+
 
-API_DIR = '/tmp/sco'
 DATA_DIR = './data'
 CSV_FILE = './data/csv/attachment1.csv'
 
-class TestSCODataStoreAPIMethods(unittest.TestCase):
+# Model parameter definitions for prediction tests
+ATTR_DEFS = [
+    attributes.AttributeDefinition(
+        'gabor_orientations',
+        'gabor_orientations',
+        '',
+        attributes.FloatType()
+    ),
+    attributes.AttributeDefinition(
+        'max_eccentricity',
+        'max_eccentricity',
+        '',
+        attributes.IntType()
+    )
+]
+
+
+def tearDownModule():
+    """Remove the uncompressed archive copies."""
+    remove_uncompressed_archives()
+
+
+class TestSCODataStoreAPIMethods(MongoTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Get uncompressed copies of the subject and image group archives
+        that are shared by all tests."""
+        super(TestSCODataStoreAPIMethods, cls).setUpClass()
+        cls.SUBJECT_FILE = uncompressed_archive(
+            os.path.join(DATA_DIR, 'subjects/ernie.tar.gz')
+        )
+        cls.IMAGE_GROUP_FILE = uncompressed_archive(
+            os.path.join(DATA_DIR, 'images/images.tar.gz')
+        )
+        cls.PRED_IMAGE_SET_FILE = cls.IMAGE_GROUP_FILE
 
     def setUp(self):
-        """Connect to MongoDB and clear any existing collections. Ensure
-        that data directory exists and is empty. Then create API."""
-        self.SUBJECT_FILE = os.path.join(DATA_DIR, 'subjects/ernie.tar.gz')
+        """Connect to MongoDB and clear the test database. Create an empty
+        temporary data directory that is removed after the test. Then create
+        API."""
         self.IMAGE_FILE = os.path.join(DATA_DIR, 'images/collapse.gif')
         self.NON_IMAGE_FILE = os.path.join(DATA_DIR, 'images/no-image.txt')
-        self.IMAGE_GROUP_FILE = os.path.join(DATA_DIR, 'images/images.tar.gz')
-        self.PRED_IMAGE_SET_FILE = os.path.join(DATA_DIR, 'images/images.tar.gz')
         self.FMRI_FILE = os.path.join(DATA_DIR, 'fmris/data.mgz')
-        m = mongo.MongoDBFactory(db_name='scotest')
-        db = m.get_database()
+        self.IMAGE_GROUP_ARCHIVE = os.path.join(DATA_DIR, 'images/images.tar.gz')
+        super(TestSCODataStoreAPIMethods, self).setUp()
+        api_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, api_dir, ignore_errors=True)
+        self.api = api.SCODataStore(self.mongo, api_dir)
+
+    def check_resource_api(self, obj, obj_type, get, list_objects, download, upsert, delete):
+        """Test the get, list, download, upsert property, and delete methods
+        that the API provides for a resource. Expects the given object to be
+        the only resource of its type in the database.
+        """
+        # Ensure that the created object is of expected type
+        self.assertEqual(obj.type, obj_type)
+        # Get object and ensure that it is still of expected type
+        obj = get(obj.identifier)
+        self.assertEqual(obj.type, obj_type)
+        # Ensure that getting an object with unknown identifier is None
+        self.assertIsNone(get('not-a-valid-identifier'))
+        # Ensure that the list of objects contains one element
+        self.assertEqual(list_objects().total_count, 1)
+        # Ensure that the download file exists
+        self.assertTrue(os.path.isfile(download(obj.identifier).file))
+        # The download for a non-existing object should be None
+        self.assertIsNone(download('not-a-valid-identifier'))
+        # Updating the object name should return object handle
+        self.assertIsNotNone(
+            upsert(obj.identifier, {datastore.PROPERTY_NAME : 'Some Name'})
+        )
+        # Updating the file name should raise exception
+        with self.assertRaises(ValueError):
+            upsert(obj.identifier, {datastore.PROPERTY_FILENAME : 'Some.Name'})
+        # Assert that delete returns not None and that the deleted object is
+        # no longer accessible. Repeated deletes are covered by
+        # test_delete_is_idempotent.
+        self.assertIsNotNone(delete(obj.identifier))
+        self.assertIsNone(get(obj.identifier))
+
+    def test_delete_is_idempotent(self):
+        """Test that deleted objects can neither be deleted nor modified. All
+        resources share the same delete implementation. The test uses an
+        image file since it is the cheapest resource to create."""
+        img = self.api.images_create(self.IMAGE_FILE)
+        self.assertIsNotNone(self.api.image_files_delete(img.identifier))
+        # Ensure that the list of images contains no elements
+        self.assertEqual(self.api.image_files_list().total_count, 0)
+        # Ensure that deleting a deleted image returns None
+        self.assertIsNone(self.api.image_files_delete(img.identifier))
+        # Updating the name of deleted image should return None
+        self.assertIsNone(
+            self.api.image_files_upsert_property(
+                img.identifier,
+                {datastore.PROPERTY_NAME : 'Some Name'}
+            )
+        )
+
+    def test_image_files_api(self):
+        """Test all image file related methods of API."""
+        # Ensure that creating image with invalid suffix raises Exception
+        with self.assertRaises(ValueError):
+            self.api.images_create(self.NON_IMAGE_FILE)
+        # Create image object file
+        self.check_resource_api(
+            self.api.images_create(self.IMAGE_FILE),
+            TYPE_IMAGE,
+            self.api.image_files_get,
+            self.api.image_files_list,
+            self.api.image_files_download,
+            self.api.image_files_upsert_property,
+            self.api.image_files_delete
+        )
+
+    def test_image_groups_api(self):
+        """Test all image group related methods of API."""
+        # Create image group object from the original gzipped archive. The
+        # other tests use the uncompressed copy. Ensure that the group name is
+        # the file name without the archive suffix.
+        img_grp = self.api.images_create(self.IMAGE_GROUP_ARCHIVE)
+        self.assertEqual(img_grp.name, 'images')
+        # Ensure that updating options does not raise exception
+        self.assertIsNotNone(self.api.image_groups_update_options(
+            img_grp.identifier,
+            [
+                attributes.Attribute('pixels_per_degree', 0.8),
+                attributes.Attribute('aperture_edge_width', 0.75)
+            ]
+        ))
+        # Ensure that exception is raised if unknown attribute name is given
+        with self.assertRaises(ValueError):
+            self.api.image_groups_update_options(
+                img_grp.identifier,
+                [
+                    attributes.Attribute('not_a_defined_attribute', 0.8),
+                    attributes.Attribute('pixels_per_degree', 0.75)
+                ]
+            )
+        self.check_resource_api(
+            img_grp,
+            TYPE_IMAGE_GROUP,
+            self.api.image_groups_get,
+            self.api.image_groups_list,
+            self.api.image_groups_download,
+            self.api.image_groups_upsert_property,
+            self.api.image_groups_delete
+        )
+
+    def test_prediction_image_sets_api(self):
+        """Test all prediction image set related methods of API."""
+        # Create subject and image group and experiment
+        subject = self.api.subjects_create(self.SUBJECT_FILE)
+        img_grp = self.api.images_create(self.IMAGE_GROUP_FILE)
+        experiment = self.api.experiments_create(subject.identifier, img_grp.identifier, {'name':'Name'})
+        model_run = self.api.experiments_predictions_create(experiment.identifier, 'Model', [], 'Name')
+        model_run = self.api.experiments_predictions_update_state_active(
+            experiment.identifier,
+            model_run.identifier
+        )
+        # Ensure that creating a prediction image set for unfinished run Raises
+        # an exception
+        with self.assertRaises(ValueError):
+            img_sets = self.api.experiments_predictions_image_set_create(
+                experiment.identifier,
+                model_run.identifier,
+                self.PRED_IMAGE_SET_FILE
+            )
+        # Set state to success
+        model_run = self.api.experiments_predictions_update_state_success(
+            experiment.identifier,
+            model_run.identifier,
+            self.FMRI_FILE
+        )
+        # Create prediction image set collection from file
+        img_sets = self.api.experiments_predictions_image_set_create(
+            experiment.identifier,
+            model_run.identifier,
+            self.PRED_IMAGE_SET_FILE
+        )
+        # Ensure that the created object is an prediction image set handle
+        self.assertEqual(img_sets.type, TYPE_PREDICTION_IMAGE_SET)
+
+    def test_subjects_api(self):
+        """Test all subject related methods of API."""
+        self.check_resource_api(
+            self.api.subjects_create(self.SUBJECT_FILE),
+            TYPE_SUBJECT,
+            self.api.subjects_get,
+            self.api.subjects_list,
+            self.api.subjects_download,
+            self.api.subjects_upsert_property,
+            self.api.subjects_delete
+        )
+
+
+class TestSCODataStoreExperimentAPIMethods(MongoTestCase):
+    """Tests for the experiment API. Experiment tests only read the subject
+    and image group that they reference. Both are created once and shared by
+    all tests in the class.
+    """
+    @classmethod
+    def setUpClass(cls):
+        """Create the API in a temporary data directory. Create the subject
+        and image group that are shared by all tests."""
+        super(TestSCODataStoreExperimentAPIMethods, cls).setUpClass()
+        cls.mongo.drop_database()
+        cls.api_dir = tempfile.mkdtemp()
+        # tearDownClass is not called if setUpClass fails. Remove the data
+        # directory in case of an error.
+        try:
+            cls.api = api.SCODataStore(cls.mongo, cls.api_dir)
+            cls.subject = cls.api.subjects_create(
+                uncompressed_archive(
+                    os.path.join(DATA_DIR, 'subjects/ernie.tar.gz')
+                )
+            )
+            cls.img_grp = cls.api.images_create(
+                uncompressed_archive(
+                    os.path.join(DATA_DIR, 'images/images.tar.gz')
+                )
+            )
+        except:
+            shutil.rmtree(cls.api_dir, ignore_errors=True)
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the temporary data directory."""
+        shutil.rmtree(cls.api_dir, ignore_errors=True)
+
+    def setUp(self):
+        """Clear all experiment, functional data, and model run objects.
+        Subjects and image groups are kept."""
+        self.FMRI_FILE = os.path.join(DATA_DIR, 'fmris/data.mgz')
+        db = self.mongo.get_database()
         db.experiments.drop()
         db.funcdata.drop()
-        db.images.drop()
-        db.imagegroups.drop()
         db.predictions.drop()
-        db.subjects.drop()
-        if os.path.isdir(API_DIR):
-            shutil.rmtree(API_DIR)
-        os.makedirs(API_DIR)
-        self.api = api.SCODataStore(m, API_DIR)
 
     def test_experiment_api(self):
-        # Create subject and image group
-        subject = self.api.subjects_create(self.SUBJECT_FILE)
-        img_grp = self.api.images_create(self.IMAGE_GROUP_FILE)
+        subject = self.subject
+        img_grp = self.img_grp
         #
         # Create experiment
         #
         experiment = self.api.experiments_create(subject.identifier, img_grp.identifier, {'name':'Name'})
         # Ensure it is of expected type
-        self.assertEquals(experiment.type, TYPE_EXPERIMENT)
+        self.assertEqual(experiment.type, TYPE_EXPERIMENT)
         # Ensure that creating experiment with missing subject or image group
         # raises an Exception
         with self.assertRaises(ValueError):
@@ -66,7 +281,7 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
         #
         experiment = self.api.experiments_get(experiment.identifier)
         # Ensure it is of expected type
-        self.assertEquals(experiment.type, TYPE_EXPERIMENT)
+        self.assertEqual(experiment.type, TYPE_EXPERIMENT)
         # Ensure that get experiment with invalid identifier is None
         self.assertIsNone(self.api.experiments_get('not-a-valid-identifier'))
         #
@@ -87,7 +302,6 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
         )
         self.assertIsNotNone(experiment)
         # Ensure that properties are set as expected
-        experiment = self.api.experiments_get(experiment.identifier)
         self.assertEqual(experiment.properties[datastore.PROPERTY_NAME], 'Some Name')
         self.assertEqual(experiment.properties['someprop'], 'somevalue')
         # Ensure that existing properities are not affected if not in upsert
@@ -97,7 +311,6 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
         )
         self.assertIsNotNone(experiment)
         # Ensure that properties are set as expected
-        experiment = self.api.experiments_get(experiment.identifier)
         self.assertEqual(experiment.properties[datastore.PROPERTY_NAME], 'Some Other Name')
         self.assertTrue('someprop' in experiment.properties)
         # Delete Property
@@ -108,9 +321,15 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
         )
         self.assertIsNotNone(experiment)
         # Ensure that properties are set as expected
-        experiment = self.api.experiments_get(experiment.identifier)
         self.assertEqual(experiment.properties[datastore.PROPERTY_NAME], 'Some Other Name')
         self.assertFalse('someprop' in experiment.properties)
+        # Ensure that exception is raised for invalid property names
+        for key in ['a.b', '$x', '', 1]:
+            with self.assertRaises(ValueError):
+                self.api.experiments_upsert_property(
+                    experiment.identifier,
+                    {key : 1}
+                )
         #
         # Delete
         #
@@ -126,18 +345,27 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
                 {datastore.PROPERTY_NAME : 'Some Name'}
             )
         )
+        # Invalid property names for deleted or unknown experiments should
+        # return None as well
+        for identifier in [experiment.identifier, 'not-a-valid-identifier']:
+            self.assertIsNone(
+                self.api.experiments_upsert_property(identifier, {'a.b' : 1})
+            )
+            self.assertIsNone(
+                self.api.experiments_upsert_property(identifier, {'$x' : 1})
+            )
 
     def test_experiment_fmri_api(self):
-        # Create subject and image group and experiment
-        subject = self.api.subjects_create(self.SUBJECT_FILE)
-        img_grp = self.api.images_create(self.IMAGE_GROUP_FILE)
+        # Create experiment for the shared subject and image group
+        subject = self.subject
+        img_grp = self.img_grp
         experiment = self.api.experiments_create(subject.identifier, img_grp.identifier, {'name':'Name'})
         #
         # Create experiment fMRI object
         #
         fmri = self.api.experiments_fmri_create(experiment.identifier, self.FMRI_FILE)
         # Ensure that object is of expected type
-        self.assertEquals(fmri.type, TYPE_FUNCDATA)
+        self.assertEqual(fmri.type, TYPE_FUNCDATA)
         # Ensure that creating fMRI for unknown experiment returns None
         self.assertIsNone(self.api.experiments_fmri_create('not-a-valid-identifier', self.FMRI_FILE))
         #
@@ -145,7 +373,7 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
         #
         fmri = self.api.experiments_fmri_get(experiment.identifier)
         # Ensure that object is of expected type
-        self.assertEquals(fmri.type, TYPE_FUNCDATA)
+        self.assertEqual(fmri.type, TYPE_FUNCDATA)
         #
         # Download
         #
@@ -179,38 +407,24 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
 
 
     def test_experiment_prediction_api(self):
-        # Create subject and image group and experiment
-        subject = self.api.subjects_create(self.SUBJECT_FILE)
-        img_grp = self.api.images_create(self.IMAGE_GROUP_FILE)
+        # Create experiment for the shared subject and image group
+        subject = self.subject
+        img_grp = self.img_grp
         experiment = self.api.experiments_create(subject.identifier, img_grp.identifier, {'name':'Name'})
         #
         # Create experiment prediction object
         #
         model_run = self.api.experiments_predictions_create(experiment.identifier, 'Model', [], 'Name')
         # Ensure that object is of expected type
-        self.assertEquals(model_run.type, TYPE_MODEL_RUN)
+        self.assertEqual(model_run.type, TYPE_MODEL_RUN)
         # Ensure that creating fMRI for unknown experiment returns None
         self.assertIsNone(self.api.experiments_predictions_create('not-a-valid-identifier', 'Model', [], 'Name'))
         # Create second experiment and prediction with arguments
         exp2 = self.api.experiments_create(subject.identifier, img_grp.identifier, {'name':'Name'})
-        attrDefs = [
-            attributes.AttributeDefinition(
-                'gabor_orientations',
-                'gabor_orientations',
-                '',
-                attributes.FloatType()
-            ),
-            attributes.AttributeDefinition(
-                'max_eccentricity',
-                'max_eccentricity',
-                '',
-                attributes.IntType()
-            )
-        ]
         mr2 = self.api.experiments_predictions_create(
             exp2.identifier,
             'Model',
-            attrDefs,
+            ATTR_DEFS,
             'Name',
             arguments=[
                 {'name': 'gabor_orientations', 'value': 10},
@@ -222,7 +436,7 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
         #
         model_run = self.api.experiments_predictions_get(experiment.identifier, model_run.identifier)
         # Ensure object is of expected type
-        self.assertEquals(model_run.type, TYPE_MODEL_RUN)
+        self.assertEqual(model_run.type, TYPE_MODEL_RUN)
         # Ensure invalud experiment and prediction combination is None
         self.assertIsNone(self.api.experiments_predictions_get(experiment.identifier, mr2.identifier))
         self.assertIsNone(self.api.experiments_predictions_get(exp2.identifier, model_run.identifier))
@@ -256,13 +470,13 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
         )
         # Ensure that state change has happened and is persistent
         self.assertTrue(model_run.state.is_running)
-        # Set state to success
+        # Set state to success. The returned handle reflects the state that
+        # was written to the database.
         model_run = self.api.experiments_predictions_update_state_success(
             experiment.identifier,
             model_run.identifier,
             self.FMRI_FILE
         )
-        model_run = self.api.experiments_predictions_get(experiment.identifier, model_run.identifier)
         self.assertTrue(model_run.state.is_success)
         # Attach file to successful model run
         self.api.experiments_predictions_attachments_create(
@@ -278,7 +492,7 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
             'attachment',
         )
         with open(file_info.file, 'r') as f:
-            self.assertEquals(f.read().strip(), '1')
+            self.assertEqual(f.read().strip(), '1')
         # Delete attached file
         self.assertTrue(self.api.experiments_predictions_attachments_delete(
             experiment.identifier,
@@ -290,7 +504,7 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
             self.api.experiments_predictions_create(
                 exp2.identifier,
                 'Model',
-                attrDefs,
+                ATTR_DEFS,
                 'Name',
                 arguments=[
                     {'name': 'gabor_orientations', 'value': 10},
@@ -302,209 +516,13 @@ class TestSCODataStoreAPIMethods(unittest.TestCase):
             self.api.experiments_predictions_create(
                 exp2.identifier,
                 'Model',
-                attrDefs,
+                ATTR_DEFS,
                 'Name',
                 arguments=[
                     {'name': 'gabor_orientations', 'value': 'ten'}
                 ]
             )
 
-    def test_image_files_api(self):
-        """Test all image file related methods of API."""
-        #
-        # Create image object file
-        #
-        img = self.api.images_create(self.IMAGE_FILE)
-        # Ensure that the created object is an image file
-        self.assertEquals(img.type, TYPE_IMAGE)
-        # Ensure that creating image with invalid suffix raises Exception
-        with self.assertRaises(ValueError):
-            self.api.images_create(self.NON_IMAGE_FILE)
-        #
-        # Get image and ensure that it is still of expected type
-        #
-        img = self.api.image_files_get(img.identifier)
-        self.assertEquals(img.type, TYPE_IMAGE)
-        # Ensure that getting an image with unknown identifier is None
-        self.assertIsNone(self.api.image_files_get('not-a-valid-identifier'))
-        #
-        # Ensure that the list of images contains one element
-        #
-        self.assertEqual(self.api.image_files_list().total_count, 1)
-        #
-        # Ensure that the download file exists
-        #
-        self.assertTrue(os.path.isfile(self.api.image_files_download(img.identifier).file))
-        # The download for a non-existing image should be None
-        self.assertIsNone(self.api.image_files_download('not-a-valid-identifier'))
-        #
-        # Updating the image name should return object handle
-        #
-        self.assertIsNotNone(
-            self.api.image_files_upsert_property(
-                img.identifier,
-                {datastore.PROPERTY_NAME : 'Some Name'}
-            )
-        )
-        # Updating the file name should raise exception
-        with self.assertRaises(ValueError):
-            self.api.image_files_upsert_property(
-                img.identifier,
-                {datastore.PROPERTY_FILENAME : 'Some.Name'}
-            )
-        #
-        # Assert that delete returns not None
-        #
-        self.assertIsNotNone(self.api.image_files_delete(img.identifier))
-        # Ensure that the list of images contains no elements
-        self.assertEqual(self.api.image_files_list().total_count, 0)
-        # Ensure that deleting a deleted image returns None
-        self.assertIsNone(self.api.image_files_delete(img.identifier))
-        # Updating the name of deleted image should return None
-        self.assertIsNone(
-            self.api.image_files_upsert_property(
-                img.identifier,
-                {datastore.PROPERTY_NAME : 'Some Name'}
-            )
-        )
-
-    def test_image_groups_api(self):
-        """Test all image group related methods of API."""
-        # Create image group object from file
-        img_grp = self.api.images_create(self.IMAGE_GROUP_FILE)
-        # Ensure that the created object is an image group
-        self.assertEquals(img_grp.type, TYPE_IMAGE_GROUP)
-        # Get image group and ensure that it is still of expected type
-        img_grp = self.api.image_groups_get(img_grp.identifier)
-        self.assertEquals(img_grp.type, TYPE_IMAGE_GROUP)
-        # Ensure that getting an image group with unknown identifier is None
-        self.assertIsNone(self.api.image_groups_get('not-a-valid-identifier'))
-        # Ensure that the list of image groups contains one element
-        self.assertEqual(self.api.image_groups_list().total_count, 1)
-        # Ensure that the download file exists
-        self.assertTrue(os.path.isfile(self.api.image_groups_download(img_grp.identifier).file))
-        # The download for a non-existing image should be None
-        self.assertIsNone(self.api.image_groups_download('not-a-valid-identifier'))
-        # Updating the image group name should return object handle
-        self.assertIsNotNone(
-            self.api.image_groups_upsert_property(
-                img_grp.identifier,
-                {datastore.PROPERTY_NAME : 'Some Name'}
-            )
-        )
-        # Updating the file name should raise exception
-        with self.assertRaises(ValueError):
-            self.api.image_groups_upsert_property(
-                img_grp.identifier,
-                {datastore.PROPERTY_FILENAME : 'Some.Name'}
-            )
-        # Ensure that updating options does not raise exception
-        self.assertIsNotNone(self.api.image_groups_update_options(
-            img_grp.identifier,
-            [
-                attributes.Attribute('pixels_per_degree', 0.8),
-                attributes.Attribute('aperture_edge_width', 0.75)
-            ]
-        ))
-        # Ensure that exception is raised if unknown attribute name is given
-        with self.assertRaises(ValueError):
-            self.api.image_groups_update_options(
-                img_grp.identifier,
-                [
-                    attributes.Attribute('not_a_defined_attribute', 0.8),
-                    attributes.Attribute('pixels_per_degree', 0.75)
-                ]
-            )
-        self.assertIsNotNone(self.api.image_groups_delete(img_grp.identifier))
-        # Ensure that the list of image groups contains no elements
-        self.assertEqual(self.api.image_groups_list().total_count, 0)
-        # Ensure that deleting a deleted image group returns None
-        self.assertIsNone(self.api.image_groups_delete(img_grp.identifier))
-        # Updating the name of deleted image should return None
-        self.assertIsNone(
-            self.api.image_groups_upsert_property(
-                img_grp.identifier,
-                {datastore.PROPERTY_NAME : 'Some Name'}
-            )
-        )
-
-    def test_prediction_image_sets_api(self):
-        """Test all prediction image set related methods of API."""
-        # Create subject and image group and experiment
-        subject = self.api.subjects_create(self.SUBJECT_FILE)
-        img_grp = self.api.images_create(self.IMAGE_GROUP_FILE)
-        experiment = self.api.experiments_create(subject.identifier, img_grp.identifier, {'name':'Name'})
-        model_run = self.api.experiments_predictions_create(experiment.identifier, 'Model', [], 'Name')
-        model_run = self.api.experiments_predictions_update_state_active(
-            experiment.identifier,
-            model_run.identifier
-        )
-        # Ensure that creating a prediction image set for unfinished run Raises
-        # an exception
-        with self.assertRaises(ValueError):
-            img_sets = self.api.experiments_predictions_image_set_create(
-                experiment.identifier,
-                model_run.identifier,
-                self.PRED_IMAGE_SET_FILE
-            )
-        # Set state to success
-        model_run = self.api.experiments_predictions_update_state_success(
-            experiment.identifier,
-            model_run.identifier,
-            self.FMRI_FILE
-        )
-        # Create prediction image set collection from file
-        img_sets = self.api.experiments_predictions_image_set_create(
-            experiment.identifier,
-            model_run.identifier,
-            self.PRED_IMAGE_SET_FILE
-        )
-        # Ensure that the created object is an prediction image set handle
-        self.assertEquals(img_sets.type, TYPE_PREDICTION_IMAGE_SET)
-
-    def test_subjects_api(self):
-        """Test all subject related methods of API."""
-        # Create temp subject file
-        subject = self.api.subjects_create(self.SUBJECT_FILE)
-        # Ensure that the created object is a subject
-        self.assertEquals(subject.type, TYPE_SUBJECT)
-        # Get subject and ensure that it is still a subject
-        subject = self.api.subjects_get(subject.identifier)
-        self.assertEquals(subject.type, TYPE_SUBJECT)
-        # Ensure that getting a subject with unknown identifier is None
-        self.assertIsNone(self.api.subjects_get('not-a-valid-identifier'))
-        # Ensure that the list of subjects contains one element
-        self.assertEqual(self.api.subjects_list().total_count, 1)
-        # Ensure that the download file exists
-        self.assertTrue(os.path.isfile(self.api.subjects_download(subject.identifier).file))
-        # The download for a non-existing subject should be None
-        self.assertIsNone(self.api.subjects_download('not-a-valid-identifier'))
-        # Updating the subject name should return object handle
-        self.assertIsNotNone(
-            self.api.subjects_upsert_property(
-                subject.identifier,
-                {datastore.PROPERTY_NAME : 'Some Name'}
-            )
-        )
-        # Updating the file name should raise exception
-        with self.assertRaises(ValueError):
-            self.api.subjects_upsert_property(
-                subject.identifier,
-                {datastore.PROPERTY_FILENAME : 'Some.Name'}
-            )
-        # Assert that delete returns not None
-        self.assertIsNotNone(self.api.subjects_delete(subject.identifier))
-        # Ensure that the list of subjects contains no elements
-        self.assertEqual(self.api.subjects_list().total_count, 0)
-        # Ensure that deleting a deleted subject returns None
-        self.assertIsNone(self.api.subjects_delete(subject.identifier))
-        # Updating the name of deleted subject should return None
-        self.assertIsNone(
-            self.api.subjects_upsert_property(
-                subject.identifier,
-                {datastore.PROPERTY_NAME : 'Some Name'}
-            )
-        )
 
 if __name__ == '__main__':
     # Pass data directory as optional parameter
@@ -1,21 +1,16 @@
-import gzip
-import os
-import shutil
-import sys
 import unittest
 
-import scodata.mongo as mongo
 import scodata.experiment as experiments
 
-class TestExperimentManagerMethods(unittest.TestCase):
+from helper import MongoTestCase
+
+class TestExperimentManagerMethods(MongoTestCase):
 
     def setUp(self):
-        """Connect to MongoDB and clear an existing experiment collection.
+        """Connect to MongoDB and clear the test database.
         Create experiment manager"""
-        m = mongo.MongoDBFactory(db_name='scotest')
-        db = m.get_database()
-        db.experiments.drop()
-        self.mngr = experiments.DefaultExperimentManager(db.experiments)
+        super(TestExperimentManagerMethods, self).setUp()
+        self.mngr = experiments.DefaultExperimentManager(self.db.experiments)
 
     def test_experiment_create(self):
         """Test creation of experiment objects."""
@@ -23,7 +18,7 @@ class TestExperimentManagerMethods(unittest.TestCase):
         experiment = self.mngr.create_object('subject-id', 'images-id', {'name':'NAME'})
         # Assert that object is active and is_image property is true
         self.assertTrue(experiment.is_active)
-        self.assertEquals(experiment.type, experiments.TYPE_EXPERIMENT)
+        self.assertEqual(experiment.type, experiments.TYPE_EXPERIMENT)
         # Assert that getting the object will not throw an Exception
         identifier = experiment.identifier
         experiment = self.mngr.get_object(identifier)
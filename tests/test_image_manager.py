@@ -1,33 +1,26 @@
-import gzip
 import os
-import shutil
 import sys
 import unittest
 
-import scodata.mongo as mongo
 import scodata.attribute as attributes
 import scodata.image as images
 
-TMP_DIR = '/tmp/sco/images'
+from helper import MongoTestCase, TMP_BASE_DIR, reset_directory
+
+TMP_DIR = os.path.join(TMP_BASE_DIR, 'images')
 DATA_DIR = './data'
 IMAGES_DIR = 'images'
 IMAGES_ARCHIVE = 'images/images.tar.gz'
 
-class TestImageManagerMethods(unittest.TestCase):
+class TestImageManagerMethods(MongoTestCase):
 
     def setUp(self):
-        """Connect to MongoDB and clear an existing images and image group
-        collection. Ensure that data directory exists and is empty. Then create
-        object managers."""
-        m = mongo.MongoDBFactory(db_name='scotest')
-        db = m.get_database()
-        db.images.drop()
-        db.imagegroups.drop()
-        if os.path.isdir(TMP_DIR):
-            shutil.rmtree(TMP_DIR)
-        os.makedirs(TMP_DIR)
-        self.mngr_images = images.DefaultImageManager(db.images, TMP_DIR)
-        self.mngr_groups = images.DefaultImageGroupManager(db.imagegroups, TMP_DIR, self.mngr_images)
+        """Connect to MongoDB and clear the test database. Ensure that data
+        directory exists and is empty. Then create object managers."""
+        super(TestImageManagerMethods, self).setUp()
+        reset_directory(TMP_DIR)
+        self.mngr_images = images.DefaultImageManager(self.db.images, TMP_DIR)
+        self.mngr_groups = images.DefaultImageGroupManager(self.db.imagegroups, TMP_DIR, self.mngr_images)
 
     def test_images_create(self):
         """Test creation of images and image groups."""
@@ -35,52 +28,47 @@ class TestImageManagerMethods(unittest.TestCase):
         img_list = []
         images_dir = os.path.join(DATA_DIR, IMAGES_DIR)
         for f in os.listdir(images_dir):
-            prop_name = str(f)
-            pos = prop_name.rfind('.')
-            if pos >= 0:
-                suffix = prop_name[pos:].lower()
-                # Create temp copy of the file
-                tmp_file = os.path.join(TMP_DIR, f)
-                shutil.copyfile(os.path.join(images_dir, f), tmp_file)
+            suffix = os.path.splitext(f)[1].lower()
+            if suffix:
+                # The image manager copies the file into its own directory
+                img_file = os.path.join(images_dir, f)
                 if suffix in images.VALID_IMGFILE_SUFFIXES:
-                    img = self.mngr_images.create_object(tmp_file)
+                    img = self.mngr_images.create_object(img_file)
                     # Assert that object is active and is_image property is true
                     self.assertTrue(img.is_active)
-                    self.assertEquals(img.type, images.TYPE_IMAGE)
+                    self.assertEqual(img.type, images.TYPE_IMAGE)
                     img_list.append(img.identifier)
                 else:
                     with self.assertRaises(ValueError):
-                        self.mngr_images.create_object(tmp_file)
-                    os.remove(tmp_file)
+                        self.mngr_images.create_object(img_file)
         # We expect four images to be created
         self.assertEqual(len(img_list), 4)
         # Ensure that the list of images in the database equals the number of
         # elements in images
-        self.assertEqual(self.mngr_images.list_objects().total_count, len(img_list))
+        listing = self.mngr_images.list_objects()
+        self.assertEqual(listing.total_count, len(img_list))
         # Ensure that image files for created image objects exist and create
-        # GroupImageObjects
+        # GroupImageObjects. Uses the listing to avoid retrieving each image
+        # individually.
         group = []
-        for img_id in img_list:
-            img = self.mngr_images.get_object(img_id)
+        for img in listing.items:
+            self.assertTrue(img.identifier in img_list)
             self.assertTrue(os.path.isfile(img.image_file))
-            group.append(images.GroupImage(img_id, '/', img.name, ''))
+            group.append(images.GroupImage(img.identifier, '/', img.name, ''))
         # Create image group for image objects
-        tmp_file = os.path.join(TMP_DIR, os.path.basename(IMAGES_ARCHIVE))
-        shutil.copyfile(os.path.join(DATA_DIR, IMAGES_ARCHIVE), tmp_file)
-        img_group = self.mngr_groups.create_object('NAME', group, tmp_file)
+        archive_file = os.path.join(DATA_DIR, IMAGES_ARCHIVE)
+        img_group = self.mngr_groups.create_object('NAME', group, archive_file)
         # Ensure that object is active and is_image_group property is true
         self.assertTrue(img_group.is_active)
-        self.assertEquals(img_group.type, images.TYPE_IMAGE_GROUP)
+        self.assertEqual(img_group.type, images.TYPE_IMAGE_GROUP)
         # Get image group from database and ensure that there are four files
         # in the list, one for each of the images in img_list
         img_group = self.mngr_groups.get_object(img_group.identifier)
-        self.assertEquals(len(img_group.images), 4)
-        grp_images = {}
-        for group_image in img_group.images:
-            self.assertTrue(group_image.identifier in img_list)
-            grp_images[group_image.identifier] = group_image
-        for img_id in img_list:
-            self.assertTrue(img_id in grp_images)
+        self.assertEqual(len(img_group.images), 4)
+        self.assertEqual(
+            set([group_image.identifier for group_image in img_group.images]),
+            set(img_list)
+        )
         # Ensure that the group identifier is correct for all images in
         # img_group
         for img_id in img_list:
@@ -95,12 +83,11 @@ class TestImageManagerMethods(unittest.TestCase):
         group."""
         # Create image group with fake image
         group = [images.GroupImage('1', '/', 'NAME', '')]
-        tmp_file = os.path.join(TMP_DIR, os.path.basename(IMAGES_ARCHIVE))
-        shutil.copyfile(os.path.join(DATA_DIR, IMAGES_ARCHIVE), tmp_file)
+        archive_file = os.path.join(DATA_DIR, IMAGES_ARCHIVE)
         img_group = self.mngr_groups.create_object(
             'NAME',
             group,
-            tmp_file,
+            archive_file,
             options=[attributes.Attribute('aperture_radius', 0.8)]
         )
         # Ensure that updating attributes does not raise exception
@@ -109,46 +96,37 @@ class TestImageManagerMethods(unittest.TestCase):
             attributes.Attribute('aperture_edge_width', 0.75)
         ]
         self.mngr_groups.update_object_options(img_group.identifier, attrs)
-        # Ensure that exception is raised if unknown attribute name is given
-        with self.assertRaises(ValueError):
-            self.mngr_groups.update_object_options(
-                img_group.identifier,
-                [
-                    attributes.Attribute('not_a_defined_attribute', 0.8),
-                    attributes.Attribute('aperture_radius', 0.75)
-                ]
-            )
-        # Ensure that exception is raised if duplicate attribute names are in
-        # update list
-        with self.assertRaises(ValueError):
-            self.mngr_groups.update_object_options(
-                img_group.identifier,
-                [
-                    attributes.Attribute('aperture_radius', 0.8),
-                    attributes.Attribute('aperture_radius', 0.75)
-                ]
-            )
-        # Ensure that exception is raised if invlid value type is given
-        with self.assertRaises(ValueError):
-            self.mngr_groups.update_object_options(
-                img_group.identifier,
-                [
-                    attributes.Attribute('aperture_radius', 0.8),
-                    attributes.Attribute('aperture_edge_width', 'abc')
-                ]
-            )
+        # Ensure that exception is raised if unknown attribute name is given,
+        # if duplicate attribute names are in update list, or if invalid value
+        # type is given
+        invalid_attrs = [
+            [
+                attributes.Attribute('not_a_defined_attribute', 0.8),
+                attributes.Attribute('aperture_radius', 0.75)
+            ],
+            [
+                attributes.Attribute('aperture_radius', 0.8),
+                attributes.Attribute('aperture_radius', 0.75)
+            ],
+            [
+                attributes.Attribute('aperture_radius', 0.8),
+                attributes.Attribute('aperture_edge_width', 'abc')
+            ]
+        ]
+        for attrs in invalid_attrs:
+            with self.assertRaises(ValueError):
+                self.mngr_groups.update_object_options(img_group.identifier, attrs)
 
     def test_images_update_attributes_from_json(self):
         """Test functionality of updating attributes for an image group where
         attributes are defined as Json objects (dictionaries)."""
         # Create image group with fake image
         group = [images.GroupImage('1', '/', 'NAME', '')]
-        tmp_file = os.path.join(TMP_DIR, os.path.basename(IMAGES_ARCHIVE))
-        shutil.copyfile(os.path.join(DATA_DIR, IMAGES_ARCHIVE), tmp_file)
+        archive_file = os.path.join(DATA_DIR, IMAGES_ARCHIVE)
         img_group = self.mngr_groups.create_object(
             'NAME',
             group,
-            tmp_file,
+            archive_file,
             options=[{'name' : 'aperture_radius', 'value' : 0.8}]
         )
         # Ensure that updating attributes does not raise exception
@@ -157,42 +135,29 @@ class TestImageManagerMethods(unittest.TestCase):
             {'name' : 'aperture_edge_width', 'value' : 0.75}
         ]
         self.mngr_groups.update_object_options(img_group.identifier, attrs)
-        # Ensure that exception is raised if invalid object is given
-        with self.assertRaises(ValueError):
-            self.mngr_groups.update_object_options(
-                img_group.identifier,
-                [
-                    {'id' : 'aperture_radius', 'value' : 0.75}
-                ]
-            )
-        # Ensure that exception is raised if unknown attribute name is given
-        with self.assertRaises(ValueError):
-            self.mngr_groups.update_object_options(
-                img_group.identifier,
-                [
-                    {'name' : 'not_a_defined_attribute', 'value' : 0.8},
-                    {'name' : 'aperture_radius', 'value' : 0.75}
-                ]
-            )
-        # Ensure that exception is raised if duplicate attribute names are in
-        # update list
-        with self.assertRaises(ValueError):
-            self.mngr_groups.update_object_options(
-                img_group.identifier,
-                [
-                    {'name' : 'aperture_radius', 'value' : 0.8},
-                    {'name' : 'aperture_radius', 'value' : 0.75}
-                ]
-            )
-        # Ensure that exception is raised if invlid value type is given
-        with self.assertRaises(ValueError):
-            self.mngr_groups.update_object_options(
-                img_group.identifier,
-                [
-                    {'name' : 'aperture_radius', 'value' : 0.8},
-                    {'name' : 'aperture_edge_width', 'value' : 'abc'}
-                ]
-            )
+        # Ensure that exception is raised if invalid object is given, if
+        # unknown attribute name is given, if duplicate attribute names are in
+        # update list, or if invalid value type is given
+        invalid_attrs = [
+            [
+                {'id' : 'aperture_radius', 'value' : 0.75}
+            ],
+            [
+                {'name' : 'not_a_defined_attribute', 'value' : 0.8},
+                {'name' : 'aperture_radius', 'value' : 0.75}
+            ],
+            [
+                {'name' : 'aperture_radius', 'value' : 0.8},
+                {'name' : 'aperture_radius', 'value' : 0.75}
+            ],
+            [
+                {'name' : 'aperture_radius', 'value' : 0.8},
+                {'name' : 'aperture_edge_width', 'value' : 'abc'}
+            ]
+        ]
+        for attrs in invalid_attrs:
+            with self.assertRaises(ValueError):
+                self.mngr_groups.update_object_options(img_group.identifier, attrs)
 
 
 if __name__ == '__main__':
@@ -1,29 +1,24 @@
-import gzip
 import os
-import shutil
 import unittest
 
-import scodata.mongo as mongo
 import scodata.attribute as attributes
 import scodata.datastore as datastore
 import scodata.modelrun as predictions
 
-TMP_DIR = '/tmp/sco/runs'
+from helper import MongoTestCase, TMP_BASE_DIR, reset_directory
+
+TMP_DIR = os.path.join(TMP_BASE_DIR, 'runs')
 CSV_FILE_1 = './data/csv/attachment1.csv'
 CSV_FILE_2 = './data/csv/attachment2.csv'
 
-class TestPredictionManagerMethods(unittest.TestCase):
+class TestPredictionManagerMethods(MongoTestCase):
 
     def setUp(self):
-        """Connect to MongoDB and clear an existing modelruns collection.
-        Create the model run manager"""
-        m = mongo.MongoDBFactory(db_name='scotest')
-        db = m.get_database()
-        db.predictions.drop()
-        if os.path.isdir(TMP_DIR):
-            shutil.rmtree(TMP_DIR)
-        os.makedirs(TMP_DIR)
-        self.mngr = predictions.DefaultModelRunManager(db.modelruns, TMP_DIR)
+        """Connect to MongoDB and clear the test database. Create the model
+        run manager"""
+        super(TestPredictionManagerMethods, self).setUp()
+        reset_directory(TMP_DIR)
+        self.mngr = predictions.DefaultModelRunManager(self.db.modelruns, TMP_DIR)
 
     def test_experiment_create(self):
         """Test creation of experiment objects."""
@@ -31,16 +26,16 @@ class TestPredictionManagerMethods(unittest.TestCase):
         model_run = self.mngr.create_object('NAME', 'experiment-id', 'model-id', [])
         # Assert that object is active and is_image property is true
         self.assertTrue(model_run.is_active)
-        self.assertEquals(model_run.type, predictions.TYPE_MODEL_RUN)
+        self.assertEqual(model_run.type, predictions.TYPE_MODEL_RUN)
         # Ensure that run state is IDLE
         self.assertTrue(model_run.state.is_idle)
-        self.assertEquals(model_run.properties[datastore.PROPERTY_STATE], str(predictions.ModelRunIdle()))
+        self.assertEqual(model_run.properties[datastore.PROPERTY_STATE], str(predictions.ModelRunIdle()))
         # Get object and ansure that all properties and state are still correct
         model_run = self.mngr.get_object(model_run.identifier)
         self.assertEqual(model_run.name, 'NAME')
         self.assertEqual(model_run.experiment_id, 'experiment-id')
         self.assertTrue(model_run.state.is_idle)
-        self.assertEquals(model_run.properties[datastore.PROPERTY_STATE], str(predictions.ModelRunIdle()))
+        self.assertEqual(model_run.properties[datastore.PROPERTY_STATE], str(predictions.ModelRunIdle()))
 
     def test_run_attachments(self):
         """Test attachments for model runs."""
@@ -57,13 +52,13 @@ class TestPredictionManagerMethods(unittest.TestCase):
         run = self.mngr.create_data_file_attachment(model_run.identifier, 'attachment', CSV_FILE_1)
         attach = run.attachments['attachment']
         # Check for the filesize attribute
-        self.assertEquals(attach.filesize, os.path.getsize(CSV_FILE_1))
+        self.assertEqual(attach.filesize, os.path.getsize(CSV_FILE_1))
         # Ensure that there is a file with namee attachement in the model run
         # attachment directory
         self.assertTrue(os.path.isfile(os.path.join(run.attachment_directory, 'attachment')))
         # Read attached file. Content should be '1'
         with open(self.mngr.get_data_file_attachment(model_run.identifier, 'attachment')[0], 'r') as f:
-            self.assertEquals(f.read().strip(), '1')
+            self.assertEqual(f.read().strip(), '1')
         # Make sure the list of attachments for the model run is 1
         model_run = self.mngr.get_object(model_run.identifier)
         self.assertEqual(len(model_run.attachments), 1)
@@ -71,7 +66,7 @@ class TestPredictionManagerMethods(unittest.TestCase):
         self.mngr.create_data_file_attachment(model_run.identifier, 'attachment', CSV_FILE_2)
         # Read attached file. Content should be '1'
         with open(self.mngr.get_data_file_attachment(model_run.identifier, 'attachment')[0], 'r') as f:
-            self.assertEquals(f.read().strip(), '2')
+            self.assertEqual(f.read().strip(), '2')
         # Make sure the list of attachments for the model run is 1
         model_run = self.mngr.get_object(model_run.identifier)
         self.assertEqual(len(model_run.attachments), 1)
@@ -85,6 +80,28 @@ class TestPredictionManagerMethods(unittest.TestCase):
         model_run = self.mngr.get_object(model_run.identifier)
         self.assertEqual(len(model_run.attachments), 0)
 
+    def test_run_attachments_relative_directory(self):
+        """Test attachments for model runs if the manager has a relative base
+        directory."""
+        mngr = predictions.DefaultModelRunManager(
+            self.db.modelruns,
+            os.path.relpath(TMP_DIR)
+        )
+        model_run = mngr.create_object('NAME', 'experiment-id', 'model-id', [])
+        model_run = mngr.update_state(model_run.identifier, predictions.ModelRunActive())
+        state = predictions.ModelRunSuccess('preditcion-id')
+        model_run = mngr.update_state(model_run.identifier, state)
+        # Make sure the file is attached
+        run = mngr.create_data_file_attachment(model_run.identifier, 'attachment', CSV_FILE_1)
+        self.assertIsNotNone(run)
+        self.assertTrue(os.path.isfile(os.path.join(run.attachment_directory, 'attachment')))
+        with open(mngr.get_data_file_attachment(model_run.identifier, 'attachment')[0], 'r') as f:
+            self.assertEqual(f.read().strip(), '1')
+        # Resource identifiers with path components are still invalid
+        for resource_id in ['../attachment', 'sub/attachment']:
+            with self.assertRaises(ValueError):
+                mngr.create_data_file_attachment(model_run.identifier, resource_id, CSV_FILE_1)
+
     def test_update_run_state(self):
         # Create an model run from fake data
         model_run = self.mngr.create_object('NAME', 'experiment-id', 'model-id', [])
@@ -1,29 +1,79 @@
-import gzip
 import os
 import shutil
 import sys
+import tempfile
 import unittest
+import uuid
 
-import scodata.mongo as mongo
 import scodata.subject as subjects
 
-SUBJECT_DIR = '/tmp/sco/subjects'
+from helper import MongoTestCase, TMP_BASE_DIR, reset_directory
+from helper import remove_uncompressed_archives, uncompressed_archive
+
+SUBJECT_DIR = os.path.join(TMP_BASE_DIR, 'subjects')
 DATA_DIR = './data'
 
-class TestSubjectManagerMethods(unittest.TestCase):
+
+def tearDownModule():
+    """Remove the uncompressed archive copies."""
+    remove_uncompressed_archives()
+
+
+class TestSubjectManagerMethods(MongoTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Create an uncompressed copy of the subject archive and upload it
+        once into a prototype directory. Tests that do not test the upload
+        itself create subjects as copies of the prototype instead of
+        extracting the archive again."""
+        super(TestSubjectManagerMethods, cls).setUpClass()
+        cls.PROTOTYPE_DIR = tempfile.mkdtemp()
+        # tearDownClass is not called if setUpClass fails. Remove the prototype
+        # directory in case of an error.
+        try:
+            cls.SUBJECT_TAR_FILE = uncompressed_archive(
+                os.path.join(DATA_DIR, 'subjects/ernie.tar.gz')
+            )
+            db = cls.mongo.get_database()
+            mngr = subjects.DefaultSubjectManager(db.subjects, cls.PROTOTYPE_DIR)
+            cls.prototype = mngr.upload_file(cls.SUBJECT_TAR_FILE)
+        except:
+            shutil.rmtree(cls.PROTOTYPE_DIR, ignore_errors=True)
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the prototype directory."""
+        shutil.rmtree(cls.PROTOTYPE_DIR, ignore_errors=True)
 
     def setUp(self):
-        """Connect to MongoDB and clear an existing subjects collection. Ensure
-        that data directory exists and is empty. Then create subject manager."""
+        """Connect to MongoDB and clear the test database. Ensure that data
+        directory exists and is empty. Then create subject manager."""
         self.SUBJECT_FILE = os.path.join(DATA_DIR, 'subjects/ernie.tar.gz')
         self.FALSE_SUBJECT_FILE = os.path.join(DATA_DIR, 'subjects/false-subject.tar.gz')
-        m = mongo.MongoDBFactory(db_name='scotest')
-        db = m.get_database()
-        db.subjects.drop()
-        if os.path.isdir(SUBJECT_DIR):
-            shutil.rmtree(SUBJECT_DIR)
-        os.makedirs(SUBJECT_DIR)
-        self.mngr = subjects.DefaultSubjectManager(db.subjects, SUBJECT_DIR)
+        super(TestSubjectManagerMethods, self).setUp()
+        reset_directory(SUBJECT_DIR)
+        self.mngr = subjects.DefaultSubjectManager(self.db.subjects, SUBJECT_DIR)
+
+    def copy_prototype(self):
+        """Create a subject in the database from a copy of the prototype
+        subject directory.
+
+        Returns
+        -------
+        SubjectHandle
+        """
+        identifier = str(uuid.uuid4()).replace('-', '')
+        directory = os.path.join(SUBJECT_DIR, identifier)
+        shutil.copytree(self.prototype.directory, directory)
+        subject = subjects.SubjectHandle(
+            identifier,
+            dict(self.prototype.properties),
+            directory
+        )
+        self.mngr.insert_object(subject)
+        return subject
 
     def test_subjects_upload(self):
         """Test creation of subject objects in the database through file
@@ -33,14 +83,14 @@ class TestSubjectManagerMethods(unittest.TestCase):
         # Ensure that the created object is active
         self.assertTrue(subject.is_active)
         # Ensure that type is SUBJECT
-        self.assertEquals(subject.type, subjects.TYPE_SUBJECT)
+        self.assertEqual(subject.type, subjects.TYPE_SUBJECT)
         # Ensure that a file with the same name as the upload file exists in the
         # upload directory
         upload_file = os.path.join(SUBJECT_DIR, subject.identifier)
         upload_file = os.path.join(upload_file, subjects.UPLOAD_DIRECTORY)
         # Ensure that the subjects uplaod directory is equal to upload_file
         # directory
-        self.assertEquals(subject.upload_directory, upload_file)
+        self.assertEqual(subject.upload_directory, upload_file)
         upload_file = os.path.join(upload_file, os.path.basename(self.SUBJECT_FILE))
         self.assertTrue(os.path.isfile(upload_file))
         # Ensure that data directory exists and is a Freesurfer directory
@@ -49,19 +99,12 @@ class TestSubjectManagerMethods(unittest.TestCase):
         # Ensure that the subjects data directory equals subject_dir
         self.assertEqual(subject.data_directory, subject_dir)
         # Ensure that subjects can be created from uncompressed tar files
-        # Create uncompressed copy of subject first
-        tmp_file = os.path.join(SUBJECT_DIR, 's.tar')
-        f_in = gzip.open(self.SUBJECT_FILE, 'rb')
-        f_out = open(tmp_file, 'wb')
-        f_out.write( f_in.read() )
-        f_in.close()
-        f_out.close()
-        subject = self.mngr.upload_file(tmp_file)
+        subject = self.mngr.upload_file(self.SUBJECT_TAR_FILE)
         # Ensure that a file with the same name as the upload file exists in the
         # upload directory
         upload_file = os.path.join(SUBJECT_DIR, subject.identifier)
         upload_file = os.path.join(upload_file, 'upload')
-        upload_file = os.path.join(upload_file, 's.tar')
+        upload_file = os.path.join(upload_file, os.path.basename(self.SUBJECT_TAR_FILE))
         self.assertTrue(os.path.isfile(upload_file))
         # Ensure that data directory exists and is a Freesurfer directory
         subject_dir = os.path.join(SUBJECT_DIR, subject.identifier)
@@ -73,16 +116,16 @@ class TestSubjectManagerMethods(unittest.TestCase):
         self.assertIsNotNone(self.mngr.delete_object(subject.identifier, erase=True))
 
     def test_subjects_get_list_delete(self):
-        # Create temp subject file
-        subject = self.mngr.upload_file(self.SUBJECT_FILE)
+        # Create subject from prototype
+        subject = self.copy_prototype()
         # Ensure that there is exactly one subject in the database with the
         # same id as the created subject
         listing = self.mngr.list_objects()
         self.assertEqual(listing.total_count, 1)
         self.assertEqual(len(listing.items), 1)
         self.assertEqual(listing.items[0].identifier, subject.identifier)
-        # Create a second subject from the same file
-        subject = self.mngr.upload_file(self.SUBJECT_FILE)
+        # Create a second subject from the prototype
+        subject = self.copy_prototype()
         # Ensure that the listing now has two elements
         listing = self.mngr.list_objects()
         self.assertEqual(listing.total_count, 2)
@@ -106,7 +149,7 @@ class TestSubjectManagerMethods(unittest.TestCase):
         # Ensure that deleting deleted object is None
         self.assertIsNone(self.mngr.delete_object(subject.identifier))
         # Ensure that erase works as well
-        subject = self.mngr.upload_file(self.SUBJECT_FILE)
+        subject = self.copy_prototype()
         self.assertIsNotNone(self.mngr.delete_object(subject.identifier, erase=True))
 
 if __name__ == '__main__':
@@ -0,0 +1,35 @@
+import datetime
+import unittest
+
+import scodata.datastore as datastore
+
+class TestTimestamp(unittest.TestCase):
+
+    def test_timestamp_from_string(self):
+        """Test parsing timestamps with and without fractions of a second."""
+        # Full fraction as generated by datetime.isoformat()
+        ts = datetime.datetime(2017, 1, 2, 3, 4, 5, 123456)
+        self.assertEqual(datastore.timestamp_from_string(ts.isoformat()), ts)
+        # No fraction as generated by datetime.isoformat() if microseconds are
+        # zero
+        ts = datetime.datetime(2017, 1, 2, 3, 4, 5)
+        self.assertEqual(datastore.timestamp_from_string(ts.isoformat()), ts)
+        # Short fraction
+        self.assertEqual(
+            datastore.timestamp_from_string('2017-01-01T00:00:00.123'),
+            datetime.datetime(2017, 1, 1, 0, 0, 0, 123000)
+        )
+        # Invalid timestamps
+        invalid_values = [
+            'abc',
+            '2017-01-01',
+            '2017-01-01T00:00:00.',
+            '2017-01-01T00:00:00.1234567'
+        ]
+        for value in invalid_values:
+            with self.assertRaises(ValueError):
+                datastore.timestamp_from_string(value)
+
+
+if __name__ == '__main__':
+    unittest.main()